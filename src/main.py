@@ -4,20 +4,18 @@ from textwrap import dedent
 from dotenv import load_dotenv
 
 from src.services.search_jobs import SearchJobs
+from src.utils.tracing import configure_logging, payload_size, span, trace
 
 import warnings
 warnings.filterwarnings("ignore", category=DeprecationWarning)
 
 
-logging.basicConfig(
-    filename="logs/crewai.log",
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s"
-)
-logger = logging.getLogger(__name__)
-
+# Load the environment first, it may set LOG_FILE
 load_dotenv()
 
+configure_logging("logs/crewai.log")
+logger = logging.getLogger(__name__)
+
 if __name__ == "__main__":
 
     logger.info('Welcome to Career Search!')
@@ -27,8 +25,12 @@ if __name__ == "__main__":
                e.g. 'Software Engineer, Python, Azure, Remote'
         """))
 
-    crew = SearchJobs(query, 'US', 'data/sample_resume.txt')
-    result = crew.search()
+    # Trace the whole invocation under a single trace id
+    with trace() as trace_id, span("cli.search") as fields:
+        logger.info(f'Trace id: {trace_id}')
+        crew = SearchJobs(query, 'US', 'data/sample_resume.txt')
+        result = crew.search()
+        fields["result_bytes"] = payload_size(result)
 
     if result is None:
         logger.error("Job search crew failed to run, please try again.")
@@ -21,6 +21,8 @@ class Job(BaseModel):
     rating_notes: Optional[str]
     company_rating: Optional[int]
     company_notes: Optional[str]
+    # Links of the duplicate postings collapsed into this job
+    alternates: Optional[List[str]] = None
 
 
 class JobResults(BaseModel):
@@ -0,0 +1,165 @@
+"""
+This module provides a local store for the output of the job search crew
+stages, so that a failed run can be resumed from the failed stage.
+Classes:
+    CheckpointStore: A file based store of stage outputs keyed by run id.
+Functions:
+    make_run_id: Derive a run id from the inputs of a job search.
+"""
+
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+
+from contextlib import contextmanager
+from typing import Iterator
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINTS_DIR = "data/checkpoints"
+# Checkpoints older than this are ignored, so that resuming a search that
+# failed long ago does not reuse outdated job listings.
+CHECKPOINT_MAX_AGE = 6 * 60 * 60
+
+
+def make_run_id(*inputs: str) -> str:
+    """
+    Derive a run id from the inputs of a job search. Rerunning a search
+    with the same inputs yields the same run id and resumes it.
+    Args:
+        inputs (str): The inputs of the job search.
+    Returns:
+        str: The run id.
+    """
+    digest = hashlib.sha256()
+    for value in inputs:
+        digest.update(value.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()[:16]
+
+
+class CheckpointStore:
+    """
+    File based store of stage outputs. Each run has its own directory and
+    each stage output is saved as a JSON file in it.
+    Attributes:
+        base_dir (str): The directory holding the runs.
+        max_age (float): The age in seconds after which checkpoints expire.
+    Methods:
+        lock: Lock a run against concurrent runs with the same run id.
+        load: Load the output of a stage.
+        save: Save the output of a stage.
+        clear: Remove all checkpoints of a run.
+    """
+
+    def __init__(
+        self,
+        base_dir: str = CHECKPOINTS_DIR,
+        max_age: float = CHECKPOINT_MAX_AGE,
+    ):
+        self.base_dir = base_dir
+        self.max_age = max_age
+
+    def _path(self, run_id: str, stage: str) -> str:
+        return os.path.join(self.base_dir, run_id, f"{stage}.json")
+
+    def _lock_path(self, run_id: str) -> str:
+        return os.path.join(self.base_dir, f"{run_id}.lock")
+
+    @contextmanager
+    def lock(self, run_id: str) -> Iterator[None]:
+        """
+        Lock a run, blocking while another thread or process holds it, so
+        that one run does not clear the checkpoints of a concurrent run with
+        the same run id. The lock file is removed by clear.
+        Args:
+            run_id (str): The run id.
+        """
+        os.makedirs(self.base_dir, exist_ok=True)
+        path = self._lock_path(run_id)
+
+        while True:
+            f = open(path, "a")
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                # The holder we waited for may have removed the file, lock
+                # the file now at the path instead
+                if os.fstat(f.fileno()).st_ino == os.stat(path).st_ino:
+                    break
+            except FileNotFoundError:
+                pass
+            f.close()
+
+        with f:
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def load(self, run_id: str, stage: str) -> str | None:
+        """
+        Load the output of a stage.
+        Args:
+            run_id (str): The run id.
+            stage (str): The stage name.
+        Returns:
+            str: The stage output, or None if there is no valid checkpoint
+                younger than max_age.
+        """
+        path = self._path(run_id, stage)
+        if not os.path.exists(path):
+            return None
+
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                checkpoint = json.load(f)
+        except Exception as e:
+            logger.error(f"Ignoring invalid checkpoint {path}: {e}")
+            return None
+
+        age = time.time() - checkpoint.get("created", 0)
+        if age > self.max_age:
+            logger.info(f"Ignoring expired checkpoint {path} ({age:.0f}s old)")
+            return None
+
+        return checkpoint.get("output")
+
+    def save(self, run_id: str, stage: str, output: str):
+        """
+        Save the output of a stage. The file is written atomically so an
+        interrupted save never leaves a partial checkpoint.
+        Args:
+            run_id (str): The run id.
+            stage (str): The stage name.
+            output (str): The stage output.
+        """
+        path = self._path(run_id, stage)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        checkpoint = {"stage": stage, "created": time.time(), "output": output}
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(checkpoint, f)
+            os.replace(tmp_path, path)
+        except Exception:
+            os.remove(tmp_path)
+            raise
+
+    def clear(self, run_id: str):
+        """
+        Remove all checkpoints of a run and its lock file, to be called
+        while holding the run lock.
+        Args:
+            run_id (str): The run id.
+        """
+        shutil.rmtree(os.path.join(self.base_dir, run_id), ignore_errors=True)
+        try:
+            os.remove(self._lock_path(run_id))
+        except FileNotFoundError:
+            pass
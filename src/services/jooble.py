@@ -11,6 +11,10 @@ import logging
 
 from crewai_tools import BaseTool
 
+from src.services.rate_limiter import get_limiter
+from src.utils.dedup import dedupe_postings
+from src.utils.tracing import payload_size, span
+
 logger = logging.getLogger(__name__)
 
 
@@ -30,11 +34,26 @@ class Jooble:
     def search(self, keywords, location) -> str | None:
         """
         Query jobs from Jooble API.
+        Requests are throttled by the shared 'jooble' rate limiter, and
+        concurrent identical queries share a single upstream call.
+        Near-duplicate postings are collapsed, their links are kept in the
+        'alternates' of the surviving posting.
         Args:
             query (str): The job query to search for.
         Returns:
             response (dict): The response from Jooble API.
         """
+        # Spans the rate limiter queue, the coalescing wait and the fetch
+        with span(
+            "jooble.search", keywords=keywords, location=location
+        ) as fields:
+            jobs = get_limiter("jooble").call(
+                (self.host, keywords, location),
+                self._fetch, keywords, location)
+            fields["response_bytes"] = payload_size(jobs)
+            return jobs
+
+    def _fetch(self, keywords, location) -> str | None:
 
         # Create connection
         # connection = http.client.HTTPConnection(self.host)
@@ -48,11 +67,14 @@ class Jooble:
         # 3. send request
         try:
             # Send request
-            response = requests.post(
-                f'http://{self.host}/api/{self.key}',
-                json=body,
-                headers=headers
-            )
+            with span("jooble.fetch") as fields:
+                response = requests.post(
+                    f'http://{self.host}/api/{self.key}',
+                    json=body,
+                    headers=headers
+                )
+                fields["status_code"] = response.status_code
+                fields["response_bytes"] = len(response.content)
 
         except Exception as e:
             logger.error(f"Error: {e}")
@@ -64,8 +86,15 @@ class Jooble:
             logger.error(f"Error: {response.reason}")
             return None
         else:
-            # Process response
+            # Process response, collapsing the postings aggregated from
+            # several boards so duplicates do not reach the crew
             json_response = response.json()
+            if json_response.get("jobs"):
+                with span("jooble.dedupe") as fields:
+                    fields["postings"] = len(json_response["jobs"])
+                    json_response["jobs"] = dedupe_postings(
+                        json_response["jobs"])
+                    fields["unique_postings"] = len(json_response["jobs"])
             return json.dumps(json_response, indent=2)
 
 
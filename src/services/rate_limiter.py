@@ -0,0 +1,267 @@
+"""
+This module provides client-side throttling for the external search
+providers (Jooble, Serper) shared by all threads of the process.
+Classes:
+    TokenBucket: A thread-safe token bucket rate limiter.
+    SingleFlight: Coalesces concurrent identical calls into one upstream call.
+    ProviderLimiter: Combines a TokenBucket and SingleFlight for a provider
+        and records queue wait and coalescing metrics.
+Functions:
+    get_limiter: Get the shared ProviderLimiter of a provider.
+    limiter_metrics: Get a snapshot of the metrics of all providers.
+"""
+
+import logging
+import os
+import threading
+import time
+
+from typing import Any, Callable, Hashable
+
+logger = logging.getLogger(__name__)
+
+# Default (qps, burst) per provider, override with <PROVIDER>_QPS and
+# <PROVIDER>_BURST environment variables.
+DEFAULT_LIMITS = {
+    "jooble": (2.0, 4),
+    "serper": (5.0, 10),
+}
+FALLBACK_LIMIT = (1.0, 1)
+
+
+class TokenBucket:
+    """
+    Token bucket rate limiter. Tokens are refilled at `rate` per second up
+    to `burst` tokens. A caller that finds the bucket empty reserves the
+    next token and sleeps until it is due, so waiters are served in order.
+    Attributes:
+        rate (float): The number of tokens added per second.
+        burst (int): The maximum number of tokens in the bucket.
+    Methods:
+        acquire: Take a token, blocking until one is available.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        if rate <= 0:
+            raise ValueError(f"Rate must be positive, got {rate}")
+        if burst < 1:
+            raise ValueError(f"Burst must be at least 1, got {burst}")
+
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """
+        Take a token, blocking until one is available.
+        Returns:
+            float: The time in seconds spent waiting for the token.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # Reserve the token, going into debt if the bucket is empty
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+class _Call:
+    """
+    An in-flight call shared by the leader and its waiters.
+    """
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key: the first caller (the
+    leader) runs the function, later callers wait for it and receive the
+    same result, or the same exception.
+    Methods:
+        do: Run the function once per in-flight key.
+    """
+
+    def __init__(self):
+        self._calls: dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(
+        self, key: Hashable, fn: Callable[..., Any], *args, **kwargs
+    ) -> tuple[Any, bool]:
+        """
+        Run the function once per in-flight key.
+        Args:
+            key (Hashable): The key identifying identical calls.
+            fn (Callable): The function to run.
+        Returns:
+            tuple: The result of the call, and True if it was shared with
+                another in-flight caller.
+        Exceptions:
+            BaseException: Any exception raised by the leader's call.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn(*args, **kwargs)
+        except BaseException as e:
+            # Also KeyboardInterrupt and the like, so that waiters never
+            # mistake a failed call for a None result
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+        return call.result, False
+
+
+class ProviderLimiter:
+    """
+    Rate limiter and request coalescer of a single provider.
+    Attributes:
+        name (str): The name of the provider.
+        bucket (TokenBucket): The provider's rate limiter.
+        flight (SingleFlight): The provider's request coalescer.
+    Methods:
+        call: Run an upstream call through the coalescer and rate limiter.
+        metrics: Get a snapshot of the provider's metrics.
+    """
+
+    def __init__(self, name: str, rate: float, burst: int):
+        self.name = name
+        self.bucket = TokenBucket(rate, burst)
+        self.flight = SingleFlight()
+
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._upstream_calls = 0
+        self._coalesced = 0
+        self._queue_wait_total = 0.0
+        self._queue_wait_max = 0.0
+
+    def call(
+        self, key: Hashable, fn: Callable[..., Any], *args, **kwargs
+    ) -> Any:
+        """
+        Run an upstream call through the coalescer and rate limiter. Only
+        the leader of a coalesced group consumes a token. The queue wait of
+        the leader is its wait for a token, the one of a coalesced request
+        its wait for the leader's result.
+        Args:
+            key (Hashable): The key identifying identical requests.
+            fn (Callable): The function performing the upstream call.
+        Returns:
+            Any: The result of the upstream call.
+        """
+        with self._lock:
+            self._requests += 1
+
+        start = time.monotonic()
+        (wait, result), shared = self.flight.do(
+            key, self._throttled, fn, *args, **kwargs)
+        if shared:
+            wait = time.monotonic() - start
+
+        with self._lock:
+            if shared:
+                self._coalesced += 1
+            self._queue_wait_total += wait
+            self._queue_wait_max = max(self._queue_wait_max, wait)
+
+        if shared:
+            logger.debug(f"{self.name}: coalesced request {key}")
+        return result
+
+    def _throttled(
+        self, fn: Callable[..., Any], *args, **kwargs
+    ) -> tuple[float, Any]:
+        wait = self.bucket.acquire()
+
+        with self._lock:
+            self._upstream_calls += 1
+
+        if wait > 0:
+            logger.info(f"{self.name}: throttled for {wait:.3f}s")
+        return wait, fn(*args, **kwargs)
+
+    def metrics(self) -> dict:
+        """
+        Get a snapshot of the provider's metrics.
+        Returns:
+            dict: Request, upstream call and coalesced counts, and queue
+                wait times of the requests in seconds.
+        """
+        with self._lock:
+            requests = self._requests
+            return {
+                "qps": self.bucket.rate,
+                "burst": self.bucket.burst,
+                "requests": self._requests,
+                "upstream_calls": self._upstream_calls,
+                "coalesced_requests": self._coalesced,
+                "queue_wait_total": round(self._queue_wait_total, 6),
+                "queue_wait_avg": (
+                    round(self._queue_wait_total / requests, 6)
+                    if requests else 0.0
+                ),
+                "queue_wait_max": round(self._queue_wait_max, 6),
+            }
+
+
+_limiters: dict[str, ProviderLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(provider: str) -> ProviderLimiter:
+    """
+    Get the shared ProviderLimiter of a provider, creating it on first use
+    from the <PROVIDER>_QPS and <PROVIDER>_BURST environment variables.
+    Args:
+        provider (str): The name of the provider, e.g. 'jooble'.
+    Returns:
+        ProviderLimiter: The provider's limiter.
+    """
+    with _limiters_lock:
+        limiter = _limiters.get(provider)
+        if limiter is None:
+            qps, burst = DEFAULT_LIMITS.get(provider, FALLBACK_LIMIT)
+            prefix = provider.upper()
+            qps = float(os.environ.get(f"{prefix}_QPS", qps))
+            burst = int(os.environ.get(f"{prefix}_BURST", burst))
+            limiter = _limiters[provider] = ProviderLimiter(
+                provider, qps, burst)
+        return limiter
+
+
+def limiter_metrics() -> dict:
+    """
+    Get a snapshot of the metrics of all providers.
+    Returns:
+        dict: The metrics of each provider keyed by provider name.
+    """
+    with _limiters_lock:
+        limiters = list(_limiters.values())
+    return {limiter.name: limiter.metrics() for limiter in limiters}
@@ -0,0 +1,104 @@
+"""
+This module provides a local store for job search results, so that the
+web app redirects to the results page with a short result id instead of
+passing the resume text and the results in the URL.
+Classes:
+    ResultsStore: A file based store of job search results keyed by id.
+"""
+
+import json
+import logging
+import os
+import re
+import tempfile
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+RESULTS_DIR = "data/results"
+# Results older than this are not served and are removed on the next save
+RESULT_MAX_AGE = 24 * 60 * 60
+
+_RESULT_ID_RE = re.compile(r"^[0-9a-f]{32}$")
+
+
+class ResultsStore:
+    """
+    File based store of job search results, shared by all the workers of
+    the web server. Each result is saved as a JSON file named by its id.
+    Attributes:
+        base_dir (str): The directory holding the results.
+        max_age (float): The age in seconds after which results expire.
+    Methods:
+        save: Save a result and return its id.
+        load: Load a result by id.
+    """
+
+    def __init__(
+        self,
+        base_dir: str = RESULTS_DIR,
+        max_age: float = RESULT_MAX_AGE,
+    ):
+        self.base_dir = base_dir
+        self.max_age = max_age
+
+    def _path(self, result_id: str) -> str:
+        return os.path.join(self.base_dir, f"{result_id}.json")
+
+    def save(self, result: dict) -> str:
+        """
+        Save a result, written atomically, and remove expired results.
+        Args:
+            result (dict): The result, JSON serializable.
+        Returns:
+            str: The id of the result.
+        """
+        os.makedirs(self.base_dir, exist_ok=True)
+        self._prune()
+
+        result_id = uuid.uuid4().hex
+        fd, tmp_path = tempfile.mkstemp(dir=self.base_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(result, f)
+            os.replace(tmp_path, self._path(result_id))
+        except Exception:
+            os.remove(tmp_path)
+            raise
+
+        return result_id
+
+    def load(self, result_id: str) -> dict | None:
+        """
+        Load a result by id.
+        Args:
+            result_id (str): The id of the result.
+        Returns:
+            dict: The result, or None if the id is invalid, unknown or
+                expired.
+        """
+        # The id comes from the URL, never let it escape base_dir
+        if not _RESULT_ID_RE.match(result_id or ""):
+            return None
+
+        path = self._path(result_id)
+        try:
+            if time.time() - os.path.getmtime(path) > self.max_age:
+                return None
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.error(f"Error loading result {path}: {e}")
+            return None
+
+    def _prune(self):
+        expires = time.time() - self.max_age
+        for entry in os.scandir(self.base_dir):
+            try:
+                if entry.stat().st_mtime < expires:
+                    os.remove(entry.path)
+            except OSError:
+                pass  # Removed by another worker
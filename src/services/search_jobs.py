@@ -25,25 +25,40 @@ JobResults model schema.
 If the result is valid, it is printed; otherwise, an error message is displayed.
 """
 
+import contextvars
 import logging
 import json
 import os
+import threading
+import time
 
-from crewai import Crew, Process
-from crewai_tools import FileReadTool, SerperDevTool
+from crewai import Agent, Crew, Process
+from crewai_tools import FileReadTool
 from dotenv import load_dotenv
 from langchain_openai import AzureChatOpenAI
 
 from src.agent import AgentsFactory
 from src.models.models import JobResults
 from src.tasks import TasksFactory
+from src.services.checkpoints import CheckpointStore, make_run_id
 from src.services.jooble import JoobleSearchTool
+from src.services.serper import SerperSearchTool
+from src.utils.tracing import payload_size, span
 
 import warnings
 warnings.filterwarnings("ignore", category=DeprecationWarning)
 
 logger = logging.getLogger(__name__)
 
+# Seconds to wait before retrying a failed stage, multiplied by the attempt
+STAGE_RETRY_BACKOFF = 5
+
+# Crews still running, keyed by run id and stage, with their outcome. A
+# timed out crew stays here until it returns, so that rerunning the search
+# waits for it instead of running the stage again.
+_running_stages: dict[str, tuple[threading.Thread, dict]] = {}
+_running_stages_lock = threading.Lock()
+
 
 class SearchJobs:
     """
@@ -55,16 +70,41 @@ class SearchJobs:
     the results using the summarization_expert_agent. The crew is created
     using the Crew class from the CrewAI library, and the agents and tasks
     are created using the AgentsFactory and TasksFactory classes.
+    Each task of the crew runs as a stage whose output is checkpointed
+    under the run id, so that a failed search restarts from the failed
+    stage when it is run again.
     Attributes:
         keywords (str): The keywords for finding relevant jobs.
+        run_id (str): The id of the run, derived from the search inputs
+            if not provided.
+        checkpoints (CheckpointStore): The store of the stage outputs.
     Methods:
         search: search jobs and return the result
     """
 
-    def __init__(self, keywords: str, location: str, resume: str):
+    def __init__(
+        self,
+        keywords: str,
+        location: str,
+        resume: str,
+        run_id: str | None = None,
+        checkpoints: CheckpointStore | None = None,
+    ):
         self.keywords = keywords
         self.location = location
         self.resume = resume
+        self.run_id = run_id or self._make_run_id()
+        self.checkpoints = checkpoints or CheckpointStore()
+
+    def _make_run_id(self) -> str:
+        # Key the run on the resume content, the file name may be reused
+        try:
+            with open(self.resume, "r", encoding="utf-8") as f:
+                resume = f.read()
+        except OSError:
+            resume = self.resume
+
+        return make_run_id(self.keywords, self.location, resume)
 
     def search(self) -> str:
         """
@@ -76,11 +116,13 @@ class SearchJobs:
             4. Structure results: Summarize the results and structure them into
                 a JSON format.
             5. Return the result.
+        Completed stages are checkpointed and skipped when a failed run
+        is resumed.
         Returns:
             result (str): The result of the job search crew.
         """
 
-        logger.info('Running Job Search Crew...')
+        logger.info(f'Running Job Search Crew (run {self.run_id})...')
         verbose = False
 
         try:
@@ -112,35 +154,35 @@ class SearchJobs:
             jooble_search_tool = JoobleSearchTool(
                 host=os.environ.get("JOOBLE_HOST"),
                 key=os.environ.get("JOOBLE_API_KEY"),
-                keywords=self.keywords,
+                query=self.keywords,
                 location=self.location,
                 verbose=verbose
             )
 
             # 3. Create serper seeach tool for company rating
 
-            search_tool = SerperDevTool(n_results=5)
+            search_tool = SerperSearchTool(n_results=5)
 
             # 4. Setup the Agents pipeline for the Crew
 
             # Create the agent with the processing steps
-            agent_factory = AgentsFactory("configs/agents.yml")
+            agent_factory = AgentsFactory("src/config/agents.yml")
 
             # Agent Step 1: Search Jobs based on the keywords
             job_search_expert_agent = agent_factory.create_agent(
-                "job_search_expert", tools=[jooble_search_tool], llm=azure_llm, verbose=verbose
+                "search_jobs", tools=[jooble_search_tool], llm=azure_llm, verbose=verbose
             )
             # Agent Step 2: Rate the jobs based on the user's resume
             job_rating_expert_agent = agent_factory.create_agent(
-                "job_rating_expert", tools=[resume_file_read_tool], llm=azure_llm, verbose=verbose
+                "rate_jobs", tools=[resume_file_read_tool], llm=azure_llm, verbose=verbose
             )
             # Agent Step 3: Evaluate the companies that offer the jobs
             company_rating_expert_agent = agent_factory.create_agent(
-                "company_rating_expert", tools=[search_tool], llm=azure_llm, verbose=verbose
+                "rate_companies", tools=[search_tool], llm=azure_llm, verbose=verbose
             )
             # Agent Step 4: Summarize the results
             summarization_expert_agent = agent_factory.create_agent(
-                "summarization_expert", tools=None, llm=azure_llm, verbose=verbose
+                "summarize_results", tools=None, llm=azure_llm, verbose=verbose
             )
 
             # Response model schema
@@ -149,53 +191,200 @@ class SearchJobs:
 
             # 5. Setup the Tasks for the Crew
 
-            # Create the tasks pipeline with the processing steps
-            tasks_factory = TasksFactory("configs/tasks.yml")
-            # Task Step 1: Search Jobs based on the keywords
-            job_search_task = tasks_factory.create_task(
-                "job_search", job_search_expert_agent, keywords=self.keywords
-            )
-            # Task Step 2: Rate the jobs based on the user's resume
-            job_rating_task = tasks_factory.create_task(
-                "job_rating", job_rating_expert_agent
-            )
-            # Task Step 3: Evaluate the companies that offer the jobs
-            evaluate_company_task = tasks_factory.create_task(
-                "evaluate_company",
-                company_rating_expert_agent,
-                output_schema=response_schema,
-            )
-            # Task Step 4: Summarize the results
-            structure_results_task = tasks_factory.create_task(
-                "structure_results",
-                summarization_expert_agent,
-                output_schema=response_schema,
-            )
+            # Create the tasks pipeline with the processing steps. Each task
+            # runs as a stage of its own, receiving the previous stage output
+            # as context, so that its output can be checkpointed.
+            tasks_factory = TasksFactory("src/config/tasks.yml")
+            stages = [
+                # Task Step 1: Search Jobs based on the keywords
+                ("job_search_task", job_search_expert_agent,
+                 {"query": self.keywords}),
+                # Task Step 2: Rate the jobs based on the user's resume
+                ("job_rating_task", job_rating_expert_agent, {}),
+                # Task Step 3: Evaluate the companies that offer the jobs
+                ("evaluate_company_task", company_rating_expert_agent,
+                 {"output_schema": response_schema}),
+                # Task Step 4: Summarize the results
+                ("structure_results_task", summarization_expert_agent,
+                 {"output_schema": response_schema}),
+            ]
+
+            # 6. Launch the Crew, resuming from the last checkpoint if any
+
+            with span("crew.run", run_id=self.run_id) as fields:
+                result = self._run_stages(tasks_factory, stages, verbose)
+                fields["result_bytes"] = payload_size(result)
+            return result
+
+        except Exception as e:
+            logger.error(f"JobSearchCrew::run() Error: {e}")
+            logger.error(
+                f"Completed stages of run {self.run_id} are checkpointed, "
+                "rerun the search to resume from the failed stage.")
+            return None
+
+    def _run_stages(
+        self,
+        tasks_factory: TasksFactory,
+        stages: list[tuple[str, Agent, dict]],
+        verbose: bool,
+    ) -> str:
+        """
+        Run the stages in order, skipping those with a checkpoint from a
+        previous attempt of the run. Checkpoints are removed once the last
+        stage completes. Concurrent runs with the same run id, e.g. two
+        identical web searches, are serialized by the run lock.
+        Args:
+            tasks_factory (TasksFactory): The factory of the stage tasks.
+            stages (list): The task type, agent and task arguments of each
+                stage.
+            verbose (bool): The verbosity of the crew.
+        Returns:
+            str: The output of the last stage.
+        """
+        output = None
+        # Once a stage runs, the checkpoints of later stages are stale
+        resuming = True
+
+        with self.checkpoints.lock(self.run_id):
+            for index, (task_type, agent, task_args) in enumerate(stages, 1):
+                stage = f"{index}_{task_type}"
+
+                checkpoint = (
+                    self.checkpoints.load(self.run_id, stage)
+                    if resuming else None)
+                if checkpoint is not None:
+                    logger.info(f"Stage {stage}: resumed from checkpoint")
+                    output = checkpoint
+                    continue
+
+                resuming = False
+                output = self._run_stage(
+                    tasks_factory, task_type, agent, task_args, output,
+                    verbose)
+                self.checkpoints.save(self.run_id, stage, output)
+
+            self.checkpoints.clear(self.run_id)
+
+        return output
+
+    def _run_stage(
+        self,
+        tasks_factory: TasksFactory,
+        task_type: str,
+        agent: Agent,
+        task_args: dict,
+        context: str | None,
+        verbose: bool,
+    ) -> str:
+        """
+        Run a single stage as a one task crew, within the timeout and retry
+        budget of the task configuration. Failed attempts are retried, a
+        timed out attempt is not: it cannot be interrupted and keeps running
+        in the background, so a retry would run the same agent twice
+        concurrently and double the LLM and API spend. For the same reason,
+        rerunning the search waits for the timed out crew of the stage, if
+        still running in this process, rather than starting a new one.
+        Args:
+            tasks_factory (TasksFactory): The factory of the stage task.
+            task_type (str): The type of task of the stage.
+            agent (Agent): The agent of the stage.
+            task_args (dict): The additional arguments of the task.
+            context (str): The output of the previous stage.
+            verbose (bool): The verbosity of the crew.
+        Returns:
+            str: The output of the stage.
+        Exceptions:
+            TimeoutError: If an attempt of the stage timed out.
+            RuntimeError: If all attempts of the stage failed.
+        """
+        timeout, max_retries = tasks_factory.get_policy(task_type)
 
-            # 6 Build a Crew
+        for attempt in range(1, max_retries + 2):
+            # Tasks hold their output, create a fresh one for each attempt
+            task = tasks_factory.create_task(
+                task_type, agent, context=context, **task_args)
+            if task is None:
+                raise ValueError(f"Failed to create task {task_type}")
 
             crew = Crew(
-                agents=[
-                    job_search_expert_agent,
-                    job_rating_expert_agent,
-                    company_rating_expert_agent,
-                    summarization_expert_agent,
-                ],
-                tasks=[
-                    job_search_task,
-                    job_rating_task,
-                    evaluate_company_task,
-                    structure_results_task,
-                ],
+                agents=[agent],
+                tasks=[task],
                 verbose=verbose,
                 process=Process.sequential,
             )
 
-            # 7. Launch the Crew
-
-            result = crew.kickoff()
-            return result
-
-        except Exception as e:
-            logger.error(f"JobSearchCrew::run() Error: {e}")
-            return None
+            try:
+                with span(
+                    "crew.stage",
+                    stage=task_type,
+                    attempt=attempt,
+                    context_bytes=payload_size(context),
+                ) as fields:
+                    output = self._kickoff(
+                        crew, timeout, f"{self.run_id}/{task_type}")
+                    fields["output_bytes"] = payload_size(output)
+                return output
+            except TimeoutError:
+                logger.error(
+                    f"Stage {task_type}: attempt {attempt} timed out "
+                    f"after {timeout}s, not retrying while it is running")
+                raise
+            except Exception as e:
+                logger.error(f"Stage {task_type}: attempt {attempt} failed: {e}")
+
+            if attempt <= max_retries:
+                time.sleep(STAGE_RETRY_BACKOFF * attempt)
+
+        raise RuntimeError(
+            f"Stage {task_type} failed after {max_retries + 1} attempts")
+
+    def _kickoff(self, crew: Crew, timeout: int, key: str) -> str:
+        """
+        Kick off a crew in a worker thread and wait for it at most timeout
+        seconds. A timed out crew is abandoned: its daemon thread runs until
+        the crew returns, and being a daemon, it does not keep the CLI from
+        exiting. If the crew of a previous attempt with the same key is
+        still running, it is waited for instead of kicking off the new crew.
+        Args:
+            crew (Crew): The crew to kick off.
+            timeout (int): The timeout in seconds.
+            key (str): The key of the stage, its run id and task type.
+        Returns:
+            str: The output of the crew.
+        Exceptions:
+            TimeoutError: If the crew did not complete in time.
+        """
+        with _running_stages_lock:
+            running = _running_stages.get(key)
+            if running is None:
+                outcome = {}
+
+                def run():
+                    try:
+                        outcome["output"] = crew.kickoff()
+                    except Exception as e:
+                        outcome["error"] = e
+                    finally:
+                        with _running_stages_lock:
+                            del _running_stages[key]
+
+                # Run in a copy of the current context to keep the trace id
+                worker = threading.Thread(
+                    target=contextvars.copy_context().run, args=(run,),
+                    daemon=True)
+                running = _running_stages[key] = (worker, outcome)
+                worker.start()
+            else:
+                logger.info(
+                    f"Stage {key}: waiting for the crew of a timed out "
+                    "attempt, still running")
+
+        worker, outcome = running
+        worker.join(timeout)
+
+        if worker.is_alive():
+            raise TimeoutError(f"Crew did not complete within {timeout}s")
+        if "error" in outcome:
+            raise outcome["error"]
+        return str(outcome["output"])
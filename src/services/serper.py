@@ -0,0 +1,39 @@
+"""
+This module provides a rate limited Serper search tool.
+Classes:
+    SerperSearchTool: A crewai SerperDevTool throttled by the shared
+        'serper' rate limiter.
+"""
+import logging
+
+from typing import Any
+from crewai_tools import SerperDevTool
+
+from src.services.rate_limiter import get_limiter
+from src.utils.tracing import payload_size, span
+
+logger = logging.getLogger(__name__)
+
+
+class SerperSearchTool(SerperDevTool):
+    """
+    SerperDevTool with client-side rate limiting. Concurrent identical
+    searches, e.g. several agents evaluating the same company, share a
+    single upstream call.
+    Methods:
+        _run: Search the internet through the Serper API.
+    """
+
+    def _run(self, **kwargs: Any) -> Any:
+        """
+        Run the search through the shared 'serper' rate limiter.
+        Returns:
+            str: The search results
+        """
+        key = (self.n_results, tuple(sorted(
+            (name, str(value)) for name, value in kwargs.items())))
+
+        with span("serper.search") as fields:
+            results = get_limiter("serper").call(key, super()._run, **kwargs)
+            fields["response_bytes"] = payload_size(results)
+            return results
@@ -14,6 +14,11 @@ from src.utils.utils import load_config  # Load YAML
 
 logger = logging.getLogger(__name__)
 
+# Default execution policy of a task, override per task with the
+# 'timeout' (seconds) and 'max_retries' keys of the configuration file.
+DEFAULT_TASK_TIMEOUT = 600
+DEFAULT_TASK_MAX_RETRIES = 2
+
 
 class TasksFactory:
     """
@@ -34,6 +39,7 @@ class TasksFactory:
     Methods:
         create_task: Create a Task object based on the task_type, agent,
             query, and output_schema.
+        get_policy: Get the timeout and retry budget of a task.
     """
 
     def __init__(self, config_path):
@@ -52,6 +58,7 @@ class TasksFactory:
         agent: Agent,
         query: Optional[str] = None,
         output_schema: Optional[str] = None,
+        context: Optional[str] = None,
     ):
         """
         Create a Task object based on the task_type, agent, query, and
@@ -62,6 +69,8 @@ class TasksFactory:
             query (str, optional): The query to format into the description.
             output_schema (str, optional): The output_schema to format into
                 the expected_output.
+            context (str, optional): The output of the previous task, appended
+                to the description.
         Returns:
             Task: The Task object created based on the task_type, agent,
                 query, and output_schema.
@@ -76,6 +85,12 @@ class TasksFactory:
         if "{query}" in description and query is not None:
             description = description.format(query=query)
 
+        description = dedent(description)
+
+        if context:
+            description += (
+                f"\n\nThis is the context you're working with:\n{context}")
+
         expected_output = task_config["expected_output"]
 
         if "{output_schema}" in expected_output and output_schema is not None:
@@ -84,10 +99,26 @@ class TasksFactory:
 
         try:
             return Task(
-                description=dedent(description),
+                description=description,
                 expected_output=dedent(expected_output),
                 agent=agent,
             )
         except Exception as e:
             logger.exception(f"Error creating task: {e}")
             return None
+
+    def get_policy(self, task_type: str) -> tuple[int, int]:
+        """
+        Get the execution policy of a task from the configuration file.
+        Args:
+            task_type (str): The type of task.
+        Returns:
+            tuple: The timeout in seconds and the number of retries allowed
+                after the first failed attempt.
+        """
+        task_config = self.config.get(task_type) or {}
+
+        return (
+            int(task_config.get("timeout", DEFAULT_TASK_TIMEOUT)),
+            int(task_config.get("max_retries", DEFAULT_TASK_MAX_RETRIES)),
+        )
@@ -0,0 +1,271 @@
+"""
+The dedup module detects near-duplicate job postings, e.g. the same
+posting aggregated by Jooble from several boards with slightly different
+titles and URLs, so that duplicates are collapsed before they reach the
+LLM stages of the crew.
+
+Postings are compared by the Jaccard similarity of their word shingles
+(title, company and description), estimated with MinHash signatures.
+Candidate pairs are found with LSH banding instead of comparing all
+pairs, and signatures are computed with numpy over all postings at once.
+
+Functions:
+    minhash_signatures: Compute the MinHash signatures of texts.
+    cluster_duplicates: Find the near-duplicate clusters of texts.
+    dedupe_postings: Collapse near-duplicate Jooble postings.
+"""
+
+import itertools
+import logging
+import re
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SHINGLE_SIZE = 3  # Words per shingle
+NUM_PERM = 64  # MinHash signature length
+BANDS = 16  # LSH bands of NUM_PERM // BANDS rows each
+THRESHOLD = 0.7  # Minimum estimated Jaccard similarity of duplicates
+SEED = 1
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Odd 64-bit constants mixing word hashes into shingle hashes
+_MIX = np.array([
+    0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9,
+    0xD6E8FEB86659FD93, 0xFF51AFD7ED558CCD, 0xC4CEB9FE1A85EC53,
+], dtype=np.uint64)
+
+
+def _tokenize(
+    texts: list[str], shingle_size: int
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Hash the words of all texts, padding texts shorter than a shingle with
+    empty words. Words are hashed with the built-in str hash, which is
+    stable within the process.
+    Returns:
+        tuple: The word hashes of all texts concatenated, the number of
+            hashes of each text, and the number of words of each text.
+    """
+    docs = [_TOKEN_RE.findall(text.lower()) for text in texts]
+    words = np.fromiter(map(len, docs), dtype=np.int64, count=len(docs))
+
+    padding = np.maximum(shingle_size - words, 0)
+    for doc, pad in zip(docs, padding.tolist()):
+        if pad:
+            doc.extend([""] * pad)
+    lengths = words + padding
+
+    hashes = np.fromiter(
+        map(hash, itertools.chain.from_iterable(docs)),
+        dtype=np.int64, count=int(lengths.sum()))
+    return hashes.view(np.uint64), lengths, words
+
+
+def _shingle_hashes(
+    tokens: np.ndarray, lengths: np.ndarray, shingle_size: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Hash the word shingles of all texts.
+    Returns:
+        tuple: The shingle hashes of all texts concatenated, and the offset
+            of the first shingle of each text.
+    """
+    # A shingle starts at every word but the last shingle_size - 1 of
+    # each text, so that shingles never span two texts.
+    ends = np.cumsum(lengths)
+    valid = np.ones(len(tokens), dtype=bool)
+    for j in range(1, shingle_size):
+        valid[ends - j] = False
+    starts = np.flatnonzero(valid)
+
+    hashes = np.zeros(len(starts), dtype=np.uint64)
+    for j in range(shingle_size):
+        hashes += tokens[starts + j] * _MIX[j % len(_MIX)]
+    # Finalize (murmur3 style) so that all bits of the words contribute
+    hashes ^= hashes >> np.uint64(33)
+    hashes *= _MIX[4]
+    hashes ^= hashes >> np.uint64(29)
+
+    counts = lengths - shingle_size + 1
+    offsets = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    return hashes, offsets
+
+
+def _minhash(
+    texts: list[str], num_perm: int, shingle_size: int, seed: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Compute the MinHash signatures of texts.
+    Returns:
+        tuple: The signatures, and the number of words of each text.
+    """
+    tokens, lengths, words = _tokenize(texts, shingle_size)
+    hashes, offsets = _shingle_hashes(tokens, lengths, shingle_size)
+
+    # Multiply-shift hash functions h(x) = (a * x + b) >> 32, a odd
+    rng = np.random.RandomState(seed)
+    a = rng.randint(0, 2**32, size=(num_perm, 2), dtype=np.uint64)
+    a = (a[:, 0] << np.uint64(32)) | a[:, 1] | np.uint64(1)
+    b = rng.randint(0, 2**32, size=num_perm, dtype=np.uint64)
+    b <<= np.uint64(32)
+
+    signatures = np.empty((len(texts), num_perm), dtype=np.uint32)
+    for i in range(num_perm):
+        permuted = (hashes * a[i] + b[i]) >> np.uint64(32)
+        signatures[:, i] = np.minimum.reduceat(permuted, offsets)
+    return signatures, words
+
+
+def minhash_signatures(
+    texts: list[str],
+    num_perm: int = NUM_PERM,
+    shingle_size: int = SHINGLE_SIZE,
+    seed: int = SEED,
+) -> np.ndarray:
+    """
+    Compute the MinHash signatures of texts over their word shingles.
+    Args:
+        texts (list): The texts.
+        num_perm (int): The number of hash functions.
+        shingle_size (int): The number of words per shingle.
+        seed (int): The seed of the hash functions.
+    Returns:
+        np.ndarray: The signatures, an array of shape (len(texts), num_perm).
+    """
+    if not texts:
+        return np.empty((0, num_perm), dtype=np.uint32)
+
+    signatures, _ = _minhash(texts, num_perm, shingle_size, seed)
+    return signatures
+
+
+def cluster_duplicates(
+    texts: list[str],
+    threshold: float = THRESHOLD,
+    num_perm: int = NUM_PERM,
+    bands: int = BANDS,
+    shingle_size: int = SHINGLE_SIZE,
+) -> list[int]:
+    """
+    Find the near-duplicate clusters of texts. Texts whose signatures are
+    equal in at least one LSH band are candidates, a candidate is a
+    duplicate if its estimated similarity with the first text of the band
+    bucket reaches the threshold. Texts without words are never duplicates.
+    Args:
+        texts (list): The texts.
+        threshold (float): The minimum estimated Jaccard similarity of
+            duplicates.
+        num_perm (int): The MinHash signature length.
+        bands (int): The number of LSH bands, must divide num_perm.
+        shingle_size (int): The number of words per shingle.
+    Returns:
+        list: For each text, the index of the first text of its cluster.
+    """
+    if num_perm % bands:
+        raise ValueError(f"{bands} bands do not divide {num_perm} hashes")
+
+    count = len(texts)
+    parent = list(range(count))
+    if count < 2:
+        return parent
+
+    signatures, words = _minhash(texts, num_perm, shingle_size, SEED)
+    active = np.flatnonzero(words)
+    rows = num_perm // bands
+
+    # 1. Candidate pairs: (first text of the bucket, other text)
+    pairs = []
+    for band in range(bands):
+        columns = signatures[active, band * rows:(band + 1) * rows]
+        keys = np.zeros(len(active), dtype=np.uint64)
+        for j in range(rows):
+            keys = (keys ^ columns[:, j].astype(np.uint64)) * _MIX[j % 4]
+
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = sorted_keys[1:] != sorted_keys[:-1]
+        bucket_start = np.maximum.accumulate(
+            np.where(first, np.arange(len(order)), 0))
+
+        others = ~first
+        pairs.append(np.stack((
+            active[order[bucket_start[others]]],
+            active[order[others]],
+        ), axis=1))
+
+    pairs = np.unique(np.concatenate(pairs), axis=0)
+    if not len(pairs):
+        return parent
+
+    # 2. Keep the pairs reaching the threshold
+    similarity = (
+        signatures[pairs[:, 0]] == signatures[pairs[:, 1]]).mean(axis=1)
+    pairs = pairs[similarity >= threshold]
+
+    # 3. Merge clusters, rooted at their first text
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i, j in pairs.tolist():
+        root_i, root_j = find(i), find(j)
+        if root_i != root_j:
+            parent[max(root_i, root_j)] = min(root_i, root_j)
+
+    return [find(i) for i in range(count)]
+
+
+def _collapse(items: list, texts: list[str], links: list) -> list:
+    """
+    Collapse near-duplicate items into the first item of their cluster.
+    Returns:
+        list: The (item, alternate links) pair of each surviving item.
+    """
+    clusters = cluster_duplicates(texts)
+
+    alternates = {}
+    for i, root in enumerate(clusters):
+        if i != root and links[i] and links[i] != links[root]:
+            alternates.setdefault(root, [])
+            if links[i] not in alternates[root]:
+                alternates[root].append(links[i])
+
+    survivors = [
+        (items[i], alternates.get(i, []))
+        for i, root in enumerate(clusters) if i == root
+    ]
+    removed = len(items) - len(survivors)
+    if removed:
+        logger.info(f"Collapsed {removed} duplicate postings")
+    return survivors
+
+
+def dedupe_postings(postings: list[dict]) -> list[dict]:
+    """
+    Collapse near-duplicate Jooble postings by title, company and snippet.
+    The first posting of each cluster survives, with the links of its
+    duplicates added to its 'alternates'.
+    Args:
+        postings (list): The postings of a Jooble response.
+    Returns:
+        list: The deduplicated postings.
+    """
+    texts = [
+        " ".join(str(posting.get(field) or "")
+                 for field in ("title", "company", "snippet"))
+        for posting in postings
+    ]
+    links = [posting.get("link") for posting in postings]
+
+    deduped = []
+    for posting, alternates in _collapse(postings, texts, links):
+        if alternates:
+            posting = {**posting, "alternates": alternates}
+        deduped.append(posting)
+    return deduped
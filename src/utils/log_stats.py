@@ -0,0 +1,78 @@
+"""
+Summarize the span latencies of a JSON lines log file written with
+src.utils.tracing.
+
+Usage:
+    python -m src.utils.log_stats logs/web.log
+    python -m src.utils.log_stats logs/crewai.log --span crew.stage
+    python -m src.utils.log_stats logs/web.log --trace <trace_id>
+"""
+
+import argparse
+import json
+
+from collections import defaultdict
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+def load_spans(path: str, trace_id: str | None = None) -> dict[str, list]:
+    """
+    Load the span durations of a log file.
+    Args:
+        path (str): The path to the log file.
+        trace_id (str, optional): Only load the spans of this trace.
+    Returns:
+        dict: The durations in milliseconds of each span name.
+    """
+    spans = defaultdict(list)
+
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # Not a JSON record, e.g. a plain text line
+            if "span" not in entry or "duration_ms" not in entry:
+                continue
+            if trace_id and entry.get("trace_id") != trace_id:
+                continue
+            spans[entry["span"]].append(float(entry["duration_ms"]))
+
+    return spans
+
+
+def percentile(durations: list[float], p: float) -> float:
+    """
+    Get a percentile of sorted durations, by the nearest rank method.
+    """
+    rank = max(1, -(-len(durations) * p // 100))
+    return durations[int(rank) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Summarize the span latency percentiles of a log file")
+    parser.add_argument("path", help="path to the log file")
+    parser.add_argument("--span", help="only summarize this span")
+    parser.add_argument("--trace", help="only summarize this trace id")
+    args = parser.parse_args()
+
+    spans = load_spans(args.path, args.trace)
+    if args.span:
+        spans = {args.span: spans.get(args.span, [])}
+
+    columns = "".join(f"{f'p{p} ms':>12}" for p in PERCENTILES)
+    print(f"{'span':<28}{'count':>8}{columns}{'max ms':>12}")
+    for name in sorted(spans):
+        durations = sorted(spans[name])
+        if not durations:
+            continue
+        values = "".join(
+            f"{percentile(durations, p):>12.1f}" for p in PERCENTILES)
+        print(f"{name:<28}{len(durations):>8}{values}"
+              f"{durations[-1]:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,14 @@
 import os
+import logging
 
 import tempfile
 import fitz  # PyMuPDF
 from docx import Document
 
+from src.utils.tracing import span
+
+logger = logging.getLogger(__name__)
+
 TMP_DIR = "/tmp"
 PDF_EXT = ".pdf"
 DOCX_EXT = ".docx"
@@ -58,13 +63,15 @@ def process_file(file) -> tuple[str | None, str | None]:
             file.save(temp_file.name)
             temp_file_path = temp_file.name
             # Extract text based on file type: docx, pdf
-            if file_extension == DOCX_EXT:
-                return read_docx(temp_file_path), None
-            elif file_extension == PDF_EXT:
-                return read_pdf(temp_file_path), None
+            with span("parser.read", extension=file_extension) as fields:
+                fields["file_bytes"] = os.path.getsize(temp_file_path)
+                if file_extension == DOCX_EXT:
+                    return read_docx(temp_file_path), None
+                elif file_extension == PDF_EXT:
+                    return read_pdf(temp_file_path), None
 
     except Exception as e:
-        print(f"Error processing file: {e}")
+        logger.error(f"Error processing file: {e}")
         return None, "Error processing file"
 
     return error, text
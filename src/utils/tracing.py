@@ -0,0 +1,205 @@
+"""
+The tracing module provides structured (JSON lines) logging with a trace
+id shared by all the records of a web request or CLI invocation, and
+timed spans for the steps of a job search.
+
+Functions:
+    configure_logging: Log JSON lines to a file.
+    get_trace_id: Get the trace id of the current context.
+    parse_trace_id: Validate a trace id received from a client.
+    set_trace_id: Set the trace id of the current context.
+    reset_trace_id: Restore the previous trace id of the current context.
+    trace: Run a block under a trace id.
+    span: Time a block and log it as a span.
+    log_span: Log a span timed by the caller.
+    payload_size: Get the size of a payload without logging it.
+Classes:
+    JsonFormatter: A logging formatter writing records as JSON lines.
+"""
+
+import contextvars
+import json
+import logging
+import os
+import re
+import time
+import uuid
+
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Iterator
+
+logger = logging.getLogger(__name__)
+
+LOG_FORMAT_FIELDS = "fields"  # Record attribute holding structured fields
+
+# Trace ids accepted from clients, e.g. UUIDs or hex ids
+_TRACE_ID_RE = re.compile(r"[A-Za-z0-9._:-]{1,64}")
+
+_trace_id: contextvars.ContextVar[str | None] = contextvars.ContextVar(
+    "trace_id", default=None)
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Logging formatter writing each record as a JSON line with its time,
+    level, logger, message, trace id and structured fields, the latter
+    given as logger.info(..., extra={LOG_FORMAT_FIELDS: {...}}). Fields
+    named like the record keys are dropped.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(
+                record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "trace_id": _trace_id.get(),
+        }
+        fields = getattr(record, LOG_FORMAT_FIELDS, None) or {}
+        for key, value in fields.items():
+            entry.setdefault(key, value)
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def configure_logging(path: str, level: int = logging.INFO):
+    """
+    Log JSON lines to a file, replacing logging.basicConfig. The path can
+    be overridden with the LOG_FILE environment variable. Calling it again
+    has no effect.
+    Args:
+        path (str): The path to the log file.
+        level (int): The logging level.
+    """
+    root = logging.getLogger()
+    if any(isinstance(h.formatter, JsonFormatter) for h in root.handlers):
+        return
+
+    path = os.environ.get("LOG_FILE", path)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    handler = logging.FileHandler(path, encoding="utf-8")
+    handler.setFormatter(JsonFormatter())
+    root.addHandler(handler)
+    root.setLevel(level)
+
+
+def get_trace_id() -> str | None:
+    """
+    Get the trace id of the current context.
+    Returns:
+        str: The trace id, or None outside of a trace.
+    """
+    return _trace_id.get()
+
+
+def parse_trace_id(trace_id: str | None) -> str | None:
+    """
+    Validate a trace id received from a client, so that arbitrary header
+    values are not written to every record of the request.
+    Args:
+        trace_id (str): The trace id, e.g. an X-Request-ID header value.
+    Returns:
+        str: The trace id, or None if missing, longer than 64 characters or
+            not made of letters, digits, '.', '_', ':' and '-'.
+    """
+    if trace_id and _TRACE_ID_RE.fullmatch(trace_id):
+        return trace_id
+    return None
+
+
+def set_trace_id(trace_id: str | None = None) -> contextvars.Token:
+    """
+    Set the trace id of the current context.
+    Args:
+        trace_id (str, optional): The trace id, a new one if not provided.
+    Returns:
+        Token: The token to restore the previous trace id with
+            reset_trace_id.
+    """
+    return _trace_id.set(trace_id or uuid.uuid4().hex)
+
+
+def reset_trace_id(token: contextvars.Token):
+    """
+    Restore the trace id that was current before set_trace_id.
+    Args:
+        token (Token): The token returned by set_trace_id.
+    """
+    _trace_id.reset(token)
+
+
+@contextmanager
+def trace(trace_id: str | None = None) -> Iterator[str]:
+    """
+    Run a block under a trace id.
+    Args:
+        trace_id (str, optional): The trace id, a new one if not provided.
+    Returns:
+        str: The trace id.
+    """
+    token = set_trace_id(trace_id)
+    try:
+        yield _trace_id.get()
+    finally:
+        reset_trace_id(token)
+
+
+@contextmanager
+def span(name: str, **fields: Any) -> Iterator[dict]:
+    """
+    Time a block and log it as a span record with its duration in
+    milliseconds and status. The block can add fields to the record
+    through the yielded dict.
+    Args:
+        name (str): The name of the span, e.g. 'jooble.fetch'.
+        fields: The fields of the span record.
+    Returns:
+        dict: The fields of the span record.
+    """
+    start = time.perf_counter()
+    status = "ok"
+    try:
+        yield fields
+    except BaseException:
+        status = "error"
+        raise
+    finally:
+        log_span(name, start, status, **fields)
+
+
+def log_span(name: str, start: float, status: str = "ok", **fields: Any):
+    """
+    Log a span timed by the caller, e.g. across the hooks of a request.
+    Args:
+        name (str): The name of the span.
+        start (float): The time.perf_counter() value at the span start.
+        status (str): The status of the span, 'ok' or 'error'.
+        fields: The fields of the span record.
+    """
+    fields.update(
+        span=name,
+        duration_ms=round((time.perf_counter() - start) * 1000, 3),
+        status=status,
+    )
+    logger.info(f"span {name}", extra={LOG_FORMAT_FIELDS: fields})
+
+
+def payload_size(payload: Any) -> int:
+    """
+    Get the size of a payload, to log instead of the payload itself.
+    Args:
+        payload (Any): The payload, str, bytes or JSON serializable.
+    Returns:
+        int: The size in bytes.
+    """
+    if payload is None:
+        return 0
+    if isinstance(payload, bytes):
+        return len(payload)
+    if not isinstance(payload, str):
+        payload = json.dumps(payload, default=str)
+    return len(payload.encode("utf-8"))
@@ -0,0 +1,94 @@
+import os
+import threading
+import time
+
+import pytest
+
+from src.services.checkpoints import CheckpointStore, make_run_id
+
+RUN_ID = "run"
+
+
+@pytest.fixture
+def store(tmp_path):
+    return CheckpointStore(base_dir=str(tmp_path))
+
+
+def test_make_run_id_is_stable():
+    assert make_run_id("Python", "US", "resume") == make_run_id(
+        "Python", "US", "resume")
+    assert make_run_id("Python", "US", "resume") != make_run_id(
+        "Python", "USresume")
+
+
+def test_save_and_load(store):
+    assert store.load(RUN_ID, "1_job_search_task") is None
+
+    store.save(RUN_ID, "1_job_search_task", "first")
+    store.save(RUN_ID, "1_job_search_task", "second")
+
+    assert store.load(RUN_ID, "1_job_search_task") == "second"
+
+
+def test_failed_save_keeps_previous_checkpoint(store, tmp_path):
+    store.save(RUN_ID, "1_job_search_task", "first")
+
+    with pytest.raises(TypeError):
+        store.save(RUN_ID, "1_job_search_task", object())
+
+    assert store.load(RUN_ID, "1_job_search_task") == "first"
+    # No partial or temporary file is left behind
+    assert os.listdir(tmp_path / RUN_ID) == ["1_job_search_task.json"]
+
+
+def test_invalid_checkpoint_is_ignored(store, tmp_path):
+    store.save(RUN_ID, "1_job_search_task", "first")
+    (tmp_path / RUN_ID / "1_job_search_task.json").write_text("{")
+
+    assert store.load(RUN_ID, "1_job_search_task") is None
+
+
+def test_expired_checkpoint_is_ignored(tmp_path, monkeypatch):
+    store = CheckpointStore(base_dir=str(tmp_path), max_age=60)
+    store.save(RUN_ID, "1_job_search_task", "first")
+
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 59)
+    assert store.load(RUN_ID, "1_job_search_task") == "first"
+
+    monkeypatch.setattr(time, "time", lambda: now + 61)
+    assert store.load(RUN_ID, "1_job_search_task") is None
+
+
+def test_clear_removes_checkpoints_and_lock(store, tmp_path):
+    with store.lock(RUN_ID):
+        store.save(RUN_ID, "1_job_search_task", "first")
+        store.clear(RUN_ID)
+
+    assert store.load(RUN_ID, "1_job_search_task") is None
+    assert os.listdir(tmp_path) == []
+
+
+def test_lock_serializes_runs_across_clear(store):
+    held = []
+    overlaps = []
+
+    def run(delay):
+        # Staggered, so that some runs open the lock file after a clear
+        time.sleep(delay)
+        with store.lock(RUN_ID):
+            if held:
+                overlaps.append(1)
+            held.append(1)
+            time.sleep(0.01)
+            held.pop()
+            store.clear(RUN_ID)
+
+    threads = [
+        threading.Thread(target=run, args=(i * 0.004,)) for i in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+
+    assert overlaps == []
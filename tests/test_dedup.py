@@ -0,0 +1,95 @@
+import random
+import time
+
+from src.utils.dedup import cluster_duplicates, dedupe_postings
+
+DESCRIPTION = (
+    "We are looking for a senior Python engineer to build the data "
+    "pipelines and APIs of our job matching platform. You will design "
+    "services on AWS, review code, mentor junior engineers and work with "
+    "product managers on new features for recruiters and candidates."
+)
+
+
+def posting(link, title="Senior Python Engineer", company="TechCorp",
+            snippet=DESCRIPTION):
+    return {"title": title, "company": company, "snippet": snippet,
+            "link": link}
+
+
+def random_text(rng, words=60):
+    return " ".join(f"w{rng.randrange(100_000)}" for _ in range(words))
+
+
+def test_exact_and_near_duplicates_collapse():
+    postings = [
+        posting("https://board-a.com/1"),
+        posting("https://board-b.com/2"),
+        posting("https://board-c.com/3",
+                snippet=DESCRIPTION.replace("senior", "experienced")),
+        posting("https://board-a.com/4", title="Data Analyst",
+                company="Acme", snippet="Analyse sales data with SQL and "
+                "build dashboards for the finance team in Power BI."),
+    ]
+
+    deduped = dedupe_postings(postings)
+
+    assert [p["link"] for p in deduped] == [
+        "https://board-a.com/1", "https://board-a.com/4"]
+
+
+def test_alternates_keep_duplicate_links():
+    postings = [
+        posting("https://board-a.com/1"),
+        posting("https://board-b.com/2"),
+        posting("https://board-a.com/1"),
+        posting("https://board-c.com/3"),
+        posting(None),
+    ]
+
+    deduped = dedupe_postings(postings)
+
+    assert len(deduped) == 1
+    assert deduped[0]["alternates"] == [
+        "https://board-b.com/2", "https://board-c.com/3"]
+    # The input postings are left untouched
+    assert "alternates" not in postings[0]
+
+
+def test_postings_without_text_never_merge():
+    postings = [
+        posting("https://board-a.com/1", title="", company="", snippet=""),
+        posting("https://board-b.com/2", title=None, company=None,
+                snippet=None),
+        posting("https://board-c.com/3", title="", company="", snippet=""),
+    ]
+
+    deduped = dedupe_postings(postings)
+
+    assert deduped == postings
+
+
+def test_distinct_texts_are_kept():
+    rng = random.Random(0)
+    texts = [random_text(rng) for _ in range(1000)]
+
+    assert cluster_duplicates(texts) == list(range(len(texts)))
+
+
+def test_dedupe_50k_postings():
+    rng = random.Random(0)
+    texts = [random_text(rng) for _ in range(45_000)]
+    # Every ninth text gets a near-duplicate with one word changed
+    for i in range(0, len(texts), 9):
+        words = texts[i].split()
+        words[rng.randrange(len(words))] = "changed"
+        texts.append(" ".join(words))
+
+    start = time.perf_counter()
+    clusters = cluster_duplicates(texts)
+    elapsed = time.perf_counter() - start
+
+    assert len(texts) == 50_000
+    assert len(set(clusters)) == 45_000
+    # 2-3s on one core, the bound leaves room for slow CI machines
+    assert elapsed < 20
@@ -0,0 +1,132 @@
+import threading
+import time
+
+import pytest
+
+from src.services.rate_limiter import ProviderLimiter, SingleFlight, TokenBucket
+
+CALLERS = 10
+
+
+class Interrupted(BaseException):
+    pass
+
+
+def run_concurrently(limiter, fn, callers=CALLERS):
+    """
+    Make concurrent identical calls, holding the upstream call until all
+    callers have joined it. Returns the result or exception of each caller.
+    """
+    release = threading.Event()
+    upstream_calls = []
+
+    def upstream():
+        upstream_calls.append(1)
+        release.wait(5)
+        return fn()
+
+    outcomes = [None] * callers
+
+    def caller(i):
+        try:
+            outcomes[i] = limiter.call("key", upstream)
+        except BaseException as e:
+            outcomes[i] = e
+
+    threads = [
+        threading.Thread(target=caller, args=(i,)) for i in range(callers)]
+    for thread in threads:
+        thread.start()
+
+    deadline = time.monotonic() + 5
+    while (limiter.metrics()["requests"] < callers
+           and time.monotonic() < deadline):
+        time.sleep(0.01)
+    # Let the last callers reach the in-flight call
+    time.sleep(0.1)
+    release.set()
+
+    for thread in threads:
+        thread.join(5)
+    return outcomes, len(upstream_calls)
+
+
+def test_identical_calls_are_coalesced():
+    limiter = ProviderLimiter("test", rate=100, burst=100)
+    result = {"jobs": []}
+
+    outcomes, upstream_calls = run_concurrently(limiter, lambda: result)
+
+    assert upstream_calls == 1
+    assert all(outcome is result for outcome in outcomes)
+
+
+def test_leader_exception_is_raised_in_waiters():
+    limiter = ProviderLimiter("test", rate=100, burst=100)
+
+    def fail():
+        raise ValueError("upstream failed")
+
+    outcomes, upstream_calls = run_concurrently(limiter, fail)
+
+    assert upstream_calls == 1
+    assert all(isinstance(outcome, ValueError) for outcome in outcomes)
+
+
+def test_leader_base_exception_is_raised_in_waiters():
+    limiter = ProviderLimiter("test", rate=100, burst=100)
+
+    def interrupt():
+        raise Interrupted()
+
+    outcomes, _ = run_concurrently(limiter, interrupt)
+
+    assert all(isinstance(outcome, Interrupted) for outcome in outcomes)
+
+
+def test_single_flight_forgets_finished_calls():
+    flight = SingleFlight()
+
+    assert flight.do("key", lambda: 1) == (1, False)
+    assert flight.do("key", lambda: 2) == (2, False)
+    with pytest.raises(ValueError):
+        flight.do("key", lambda: int("x"))
+    assert flight.do("key", lambda: 3) == (3, False)
+
+
+def test_bucket_delays_call_after_burst():
+    rate, burst = 10.0, 3
+    bucket = TokenBucket(rate, burst)
+
+    start = time.monotonic()
+    waits = [bucket.acquire() for _ in range(burst + 1)]
+    elapsed = time.monotonic() - start
+
+    assert waits[:burst] == [0.0] * burst
+    assert waits[burst] == pytest.approx(1 / rate, abs=0.02)
+    assert elapsed == pytest.approx(1 / rate, abs=0.05)
+
+
+def test_bucket_rejects_invalid_limits():
+    with pytest.raises(ValueError):
+        TokenBucket(0, 1)
+    with pytest.raises(ValueError):
+        TokenBucket(1, 0)
+
+
+def test_metrics():
+    limiter = ProviderLimiter("test", rate=100, burst=100)
+
+    run_concurrently(limiter, lambda: "result")
+    limiter.call("other", lambda: "result")
+    limiter.call("another", lambda: "result")
+
+    metrics = limiter.metrics()
+    assert metrics["qps"] == 100
+    assert metrics["burst"] == 100
+    assert metrics["requests"] == CALLERS + 2
+    assert metrics["upstream_calls"] == 3
+    assert metrics["coalesced_requests"] == CALLERS - 1
+    # Coalesced requests waited about 0.1s for the held upstream call
+    assert metrics["queue_wait_max"] >= 0.05
+    assert metrics["queue_wait_total"] >= metrics["queue_wait_max"]
@@ -0,0 +1,171 @@
+import threading
+
+import pytest
+
+pytest.importorskip("crewai")
+
+from src.services import search_jobs  # noqa: E402
+from src.services.checkpoints import CheckpointStore  # noqa: E402
+from src.services.search_jobs import SearchJobs  # noqa: E402
+from src.tasks import (  # noqa: E402
+    DEFAULT_TASK_MAX_RETRIES, DEFAULT_TASK_TIMEOUT, TasksFactory
+)
+
+TASK_TYPES = [
+    "job_search_task",
+    "job_rating_task",
+    "evaluate_company_task",
+    "structure_results_task",
+]
+STAGES = [(task_type, None, {}) for task_type in TASK_TYPES]
+
+
+class StubStages:
+    """
+    Stand-in for SearchJobs._run_stage recording the stages it runs and
+    failing the given task type.
+    """
+
+    def __init__(self, fail=None):
+        self.fail = fail
+        self.calls = []
+
+    def __call__(self, tasks_factory, task_type, agent, task_args, context,
+                 verbose):
+        self.calls.append((task_type, context))
+        if task_type == self.fail:
+            raise RuntimeError(f"Stage {task_type} failed")
+        return f"output of {task_type}"
+
+
+class StubCrew:
+    def __init__(self, output, release=None):
+        self.output = output
+        self.release = release
+        self.kickoffs = 0
+
+    def kickoff(self):
+        self.kickoffs += 1
+        if self.release:
+            self.release.wait(5)
+        return self.output
+
+
+@pytest.fixture
+def store(tmp_path):
+    return CheckpointStore(base_dir=str(tmp_path))
+
+
+def make_search(store, run_stage):
+    search = SearchJobs(
+        "Python", "US", "resume.txt", run_id="run", checkpoints=store)
+    search._run_stage = run_stage
+    return search
+
+
+def test_stages_run_in_order_and_checkpoints_are_cleared(store, tmp_path):
+    stages = StubStages()
+
+    output = make_search(store, stages)._run_stages(None, STAGES, False)
+
+    assert output == "output of structure_results_task"
+    assert stages.calls == [
+        ("job_search_task", None),
+        ("job_rating_task", "output of job_search_task"),
+        ("evaluate_company_task", "output of job_rating_task"),
+        ("structure_results_task", "output of evaluate_company_task"),
+    ]
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_failed_run_resumes_from_failed_stage(store):
+    failing = StubStages(fail="evaluate_company_task")
+    with pytest.raises(RuntimeError):
+        make_search(store, failing)._run_stages(None, STAGES, False)
+
+    assert store.load("run", "2_job_rating_task") == "output of job_rating_task"
+    assert store.load("run", "3_evaluate_company_task") is None
+
+    stages = StubStages()
+    make_search(store, stages)._run_stages(None, STAGES, False)
+
+    assert stages.calls == [
+        ("evaluate_company_task", "output of job_rating_task"),
+        ("structure_results_task", "output of evaluate_company_task"),
+    ]
+
+
+def test_checkpoints_after_a_rerun_stage_are_not_reused(store):
+    # Stage 2 expired or failed to save, stage 3 was computed from the
+    # previous output of stage 2 and is stale once stage 2 runs again
+    store.save("run", "1_job_search_task", "saved job search")
+    store.save("run", "3_evaluate_company_task", "stale evaluation")
+
+    stages = StubStages()
+    output = make_search(store, stages)._run_stages(None, STAGES, False)
+
+    assert output == "output of structure_results_task"
+    assert stages.calls == [
+        ("job_rating_task", "saved job search"),
+        ("evaluate_company_task", "output of job_rating_task"),
+        ("structure_results_task", "output of evaluate_company_task"),
+    ]
+
+
+def test_expired_checkpoints_are_rerun(tmp_path):
+    store = CheckpointStore(base_dir=str(tmp_path), max_age=-1)
+    store.save("run", "1_job_search_task", "expired job search")
+
+    stages = StubStages()
+    make_search(store, stages)._run_stages(None, STAGES, False)
+
+    assert [task_type for task_type, _ in stages.calls] == TASK_TYPES
+
+
+def test_rerun_waits_for_timed_out_stage(store):
+    search = SearchJobs(
+        "Python", "US", "resume.txt", run_id="run", checkpoints=store)
+    release = threading.Event()
+    timed_out = StubCrew("late output", release)
+    rerun = StubCrew("rerun output")
+
+    with pytest.raises(TimeoutError):
+        search._kickoff(timed_out, 0.05, "run/job_search_task")
+
+    # The timed out crew completes while the rerun waits for it
+    threading.Timer(0.05, release.set).start()
+    output = search._kickoff(rerun, 5, "run/job_search_task")
+
+    assert output == "late output"
+    assert (timed_out.kickoffs, rerun.kickoffs) == (1, 0)
+    assert search_jobs._running_stages == {}
+
+
+def test_get_policy(tmp_path):
+    config = tmp_path / "tasks.yml"
+    config.write_text(
+        "job_search_task:\n"
+        "  description: Search jobs\n"
+        "  expected_output: Jobs\n"
+        "  timeout: 300\n"
+        "  max_retries: 1\n"
+        "job_rating_task:\n"
+        "  description: Rate jobs\n"
+        "  expected_output: Ratings\n"
+    )
+    factory = TasksFactory(str(config))
+
+    assert factory.get_policy("job_search_task") == (300, 1)
+    assert factory.get_policy("job_rating_task") == (
+        DEFAULT_TASK_TIMEOUT, DEFAULT_TASK_MAX_RETRIES)
+    assert factory.get_policy("unknown_task") == (
+        DEFAULT_TASK_TIMEOUT, DEFAULT_TASK_MAX_RETRIES)
+
+
+def test_stage_policies_are_configured():
+    factory = TasksFactory("src/config/tasks.yml")
+
+    for task_type in TASK_TYPES:
+        timeout, max_retries = factory.get_policy(task_type)
+        assert task_type in factory.config
+        assert timeout > 0 and max_retries >= 0
@@ -0,0 +1,136 @@
+import io
+import json
+import logging
+import time
+
+import pytest
+
+from src.utils import tracing
+from src.utils.log_stats import load_spans, percentile
+from src.utils.tracing import (
+    LOG_FORMAT_FIELDS, JsonFormatter, get_trace_id, log_span,
+    parse_trace_id, span, trace
+)
+
+
+@pytest.fixture
+def records():
+    """
+    Capture the JSON records of the tracing logger.
+    """
+    stream = io.StringIO()
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(JsonFormatter())
+    logger = tracing.logger
+    level = logger.level
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+
+    yield lambda: [json.loads(line) for line in stream.getvalue().splitlines()]
+
+    logger.removeHandler(handler)
+    logger.setLevel(level)
+
+
+def test_span_record(records):
+    with trace("abc123"):
+        with span("jooble.fetch", query="Python") as fields:
+            fields["response_bytes"] = 42
+
+    [record] = records()
+    assert record["level"] == "INFO"
+    assert record["message"] == "span jooble.fetch"
+    assert record["trace_id"] == "abc123"
+    assert record["span"] == "jooble.fetch"
+    assert record["status"] == "ok"
+    assert record["query"] == "Python"
+    assert record["response_bytes"] == 42
+    assert record["duration_ms"] >= 0
+
+
+def test_span_records_errors(records):
+    with pytest.raises(ValueError):
+        with span("parser.read"):
+            raise ValueError("bad file")
+
+    [record] = records()
+    assert record["status"] == "error"
+
+
+def test_log_span_duration(records):
+    log_span("http.request", time.perf_counter() - 0.05, "error", route="/")
+
+    [record] = records()
+    assert record["status"] == "error"
+    assert record["route"] == "/"
+    assert record["duration_ms"] >= 50
+
+
+def test_fields_do_not_overwrite_record_keys(records):
+    with trace("abc123"):
+        tracing.logger.info("Search done", extra={LOG_FORMAT_FIELDS: {
+            "message": "forged", "level": "ERROR", "ts": "0",
+            "trace_id": "forged", "jobs": 3}})
+
+    [record] = records()
+    assert record["message"] == "Search done"
+    assert record["level"] == "INFO"
+    assert record["ts"] != "0"
+    assert record["trace_id"] == "abc123"
+    assert record["jobs"] == 3
+
+
+def test_trace_restores_previous_trace_id():
+    with trace("outer"):
+        with trace() as inner:
+            assert get_trace_id() == inner != "outer"
+        assert get_trace_id() == "outer"
+    assert get_trace_id() is None
+
+
+@pytest.mark.parametrize("trace_id", [
+    "abc123",
+    "0f8fad5b-d9cb-469f-a165-70867728950e",
+    "req.1:2_3",
+    "a" * 64,
+])
+def test_parse_trace_id_accepts(trace_id):
+    assert parse_trace_id(trace_id) == trace_id
+
+
+@pytest.mark.parametrize("trace_id", [
+    None, "", "a" * 65, "abc\n", "abc\r\nX-Injected: 1", "bad id",
+    "<script>", "é",
+])
+def test_parse_trace_id_rejects(trace_id):
+    assert parse_trace_id(trace_id) is None
+
+
+def test_percentile_nearest_rank():
+    durations = [float(i) for i in range(1, 101)]
+
+    assert percentile(durations, 50) == 50
+    assert percentile(durations, 90) == 90
+    assert percentile(durations, 99) == 99
+    assert percentile(durations, 100) == 100
+    assert percentile([7.0], 50) == 7
+    assert percentile([1.0, 2.0, 3.0, 4.0], 50) == 2
+    assert percentile([1.0, 2.0, 3.0, 4.0], 95) == 4
+
+
+def test_load_spans(tmp_path):
+    log = tmp_path / "web.log"
+    log.write_text("\n".join([
+        json.dumps({"span": "http.request", "duration_ms": 5,
+                    "trace_id": "a"}),
+        json.dumps({"span": "http.request", "duration_ms": 7,
+                    "trace_id": "b"}),
+        json.dumps({"span": "crew.stage", "duration_ms": 9, "trace_id": "a"}),
+        json.dumps({"message": "not a span", "trace_id": "a"}),
+        "plain text line",
+    ]))
+
+    assert load_spans(str(log)) == {
+        "http.request": [5.0, 7.0], "crew.stage": [9.0]}
+    assert load_spans(str(log), trace_id="a") == {
+        "http.request": [5.0], "crew.stage": [9.0]}
@@ -1,17 +1,130 @@
 import os
+import gzip
 import json
+import logging
+import time
 
-from flask import Flask, request, render_template, redirect, url_for
+from datetime import timedelta
+from dotenv import load_dotenv
+from flask import (
+    Flask, g, request, render_template, redirect, url_for, jsonify
+)
 
+from src.services.rate_limiter import limiter_metrics
+from src.services.results import ResultsStore
 from src.services.search_jobs import SearchJobs
 from src.utils.parser import process_file
+from src.utils.tracing import (
+    LOG_FORMAT_FIELDS, configure_logging, get_trace_id, log_span,
+    parse_trace_id, payload_size, reset_trace_id, set_trace_id, span
+)
+
+# Load the environment first, it may set LOG_FILE
+load_dotenv()
+configure_logging("logs/web.log")
+logger = logging.getLogger(__name__)
 
 # Create a Flask application
 app = Flask(__name__)
 
+# Header carrying the trace id, taken from the client request if provided
+TRACE_HEADER = "X-Request-ID"
+
 PAGE_INDEX_HTML = "index.html"
 PAGE_RESULT_HTML = "results.html"
 
+# Search results are kept server side, the results page gets their id
+results_store = ResultsStore()
+
+# Static assets URLs carry their modification time (see static_version),
+# so browsers can cache them until the file changes. Flask serves them
+# with an ETag and answers conditional requests with 304 Not Modified.
+app.config["SEND_FILE_MAX_AGE_DEFAULT"] = timedelta(days=365)
+
+# Compress dynamic responses larger than GZIP_MIN_SIZE bytes
+GZIP_MIMETYPES = {"text/html", "application/json"}
+GZIP_MIN_SIZE = 500
+GZIP_LEVEL = 6
+
+
+@app.before_request
+def start_trace():
+    """
+    Start the trace of the request. All the records logged while handling
+    it, down to the crew and the Jooble tool, carry its trace id: the
+    client's one if valid, otherwise a new one.
+    """
+    g.trace_token = set_trace_id(
+        parse_trace_id(request.headers.get(TRACE_HEADER)))
+    g.trace_start = time.perf_counter()
+
+
+@app.after_request
+def end_trace(response):
+    """
+    Log the request span and return the trace id to the client.
+    """
+    response.headers[TRACE_HEADER] = get_trace_id()
+    # Log the route rule rather than the URL and its query string
+    log_span(
+        "http.request",
+        g.trace_start,
+        "ok" if response.status_code < 500 else "error",
+        method=request.method,
+        route=request.url_rule.rule if request.url_rule else None,
+        status_code=response.status_code,
+        request_bytes=request.content_length or 0,
+        response_bytes=response.calculate_content_length(),
+    )
+    return response
+
+
+@app.teardown_request
+def reset_trace(exc):
+    if "trace_token" in g:
+        reset_trace_id(g.pop("trace_token"))
+
+
+@app.url_defaults
+def static_version(endpoint, values):
+    """
+    Add the modification time of static files to their URLs as a cache
+    busting version: /static/css/styles.css?v=<mtime>
+    """
+    if endpoint != "static" or "filename" not in values:
+        return
+
+    try:
+        path = os.path.join(app.static_folder, values["filename"])
+        values.setdefault("v", int(os.stat(path).st_mtime))
+    except OSError:
+        pass
+
+
+@app.after_request
+def gzip_response(response):
+    """
+    Gzip HTML and JSON responses, e.g. the results page, for clients
+    accepting it.
+    """
+    if (
+        response.status_code != 200
+        or response.direct_passthrough
+        or response.mimetype not in GZIP_MIMETYPES
+        or "Content-Encoding" in response.headers
+        or "gzip" not in request.headers.get("Accept-Encoding", "").lower()
+    ):
+        return response
+
+    data = response.get_data()
+    if len(data) < GZIP_MIN_SIZE:
+        return response
+
+    response.set_data(gzip.compress(data, compresslevel=GZIP_LEVEL))
+    response.headers["Content-Encoding"] = "gzip"
+    response.vary.add("Accept-Encoding")
+    return response
+
 
 @app.route("/", methods=["GET", "POST"])
 def home():
@@ -60,7 +173,9 @@ def home():
         output_path = os.path.join('data/resumes', filename)
         if not os.path.exists(output_path):
             # Process the file
-            text, error = process_file(file)
+            with span("web.parse_resume", filename=filename) as fields:
+                text, error = process_file(file)
+                fields["text_bytes"] = payload_size(text)
             if error:
                 return render_template(PAGE_INDEX_HTML, error=error)
 
@@ -68,7 +183,7 @@ def home():
                 f.write(text)
         else:
             # Read the existing file
-            print(f'File already exists: {output_path}')
+            logger.info(f'File already exists: {output_path}')
             with open(output_path, "r", encoding="utf-8") as f:
                 text = f.read()
 
@@ -96,18 +211,23 @@ def home():
                 error = "Job search failed"
                 return render_template(PAGE_INDEX_HTML, error=error)
 
-            print(f'deserializing jobs_data: {jobs_data}')
+            logger.info(
+                'Job search results received',
+                extra={LOG_FORMAT_FIELDS: {
+                    "jobs_bytes": payload_size(jobs_data)}})
             # jobs_data = json.loads(jobs_data)
 
-            # Redirect to the result page with the extracted text and job search results
-            # /result?text={text}&jobs={jobs_data}
-            return redirect(url_for(
-                "result",
-                text=text,
-                jobs=jobs_data,
-                keywords=keywords,
-                location=location
-            ))
+            # Store the extracted text and job search results, and redirect
+            # to the result page with their id: /result?id={result_id}
+            # They are too large for the URL, servers limit the request line
+            # to a few KB.
+            result_id = results_store.save({
+                "text": text,
+                "jobs": jobs_data,
+                "keywords": keywords,
+                "location": location,
+            })
+            return redirect(url_for("result", id=result_id))
 
         except Exception as e:
             error = f"Error: {e}"
@@ -124,20 +244,24 @@ def result():
         Rendered HTML template with the search results.
     """
 
-    try:
-        keywords = request.args.get("keywords", "")
-        location = request.args.get("location", "")
+    stored = results_store.load(request.args.get("id", ""))
+    if stored is None:
+        error = "Search results not found or expired"
+        return render_template(PAGE_INDEX_HTML, error=error), 404
+
+    keywords = stored.get("keywords", "")
+    location = stored.get("location", "")
+    text = stored.get("text", "")
 
-        text = request.args.get("text", "")
-        jobs = request.args.get("jobs", "")
-        jobs = json.loads(jobs)
+    try:
+        jobs = json.loads(stored.get("jobs") or "")
         if 'jobs' not in jobs:
             jobs = {"jobs": []}
         else:
             jobs = jobs['jobs']
 
     except Exception as e:
-        print(f'Error decoding results: {e}')
+        logger.error(f'Error decoding results: {e}')
         jobs = []
 
     return render_template(
@@ -149,5 +273,18 @@ def result():
     )
 
 
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    """
+    Metrics route. The rate limiters are per process, with several server
+    workers the metrics are those of the worker answering the request.
+    Returns:
+        JSON object with the rate limiter metrics of each search provider:
+        request, upstream call and coalesced request counts, and queue wait
+        times in seconds.
+    """
+    return jsonify(limiter_metrics())
+
+
 if __name__ == "__main__":
     app.run(debug=True)
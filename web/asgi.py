@@ -0,0 +1,14 @@
+"""
+ASGI entry point of the web application, for ASGI servers such as uvicorn.
+The Flask application is wrapped with asgiref's WsgiToAsgi adapter, which
+runs each request in a thread.
+
+Usage:
+    uvicorn web.asgi:app --workers 1 --timeout-graceful-shutdown 60
+"""
+
+from asgiref.wsgi import WsgiToAsgi
+
+from web.wsgi import application
+
+app = WsgiToAsgi(application)
@@ -0,0 +1,45 @@
+"""
+Gunicorn configuration of the web application.
+
+Usage:
+    gunicorn -c web/gunicorn.conf.py web.wsgi:app
+
+Settings can be overridden with the environment variables below.
+"""
+
+import os
+
+bind = os.environ.get("WEB_BIND", "0.0.0.0:8000")
+
+# A job search is mostly waiting on the LLM and search APIs, use threaded
+# workers so that long searches do not block the form and results pages.
+worker_class = "gthread"
+# The Jooble and Serper rate limiters and request coalescing live in the
+# worker process: with N workers the providers see up to N times the
+# configured QPS, and /metrics reports the worker that answers. Scale with
+# threads, and divide <PROVIDER>_QPS by the workers if adding more.
+workers = int(os.environ.get("WEB_WORKERS", 1))
+threads = int(os.environ.get("WEB_THREADS", 32))
+
+# Import the application, the crew and the resume parsers once in the
+# master process, workers are forked with them already loaded.
+preload_app = True
+
+# Workers whose heartbeat is silent for longer than this are restarted.
+# With gthread workers the heartbeat runs apart from the request threads,
+# so this does not limit the duration of a request: the length of a live
+# search is bounded by the stage timeouts of src/config/tasks.yml.
+timeout = int(os.environ.get("WEB_TIMEOUT", 900))
+# Time given to in-flight requests to complete on restart or shutdown
+graceful_timeout = int(os.environ.get("WEB_GRACEFUL_TIMEOUT", 120))
+keepalive = 5
+
+# Recycle workers periodically to bound memory growth of the LLM clients.
+# Off by default: recycling the single worker drops its open connections
+# and resets the rate limiters.
+max_requests = int(os.environ.get("WEB_MAX_REQUESTS", 0))
+max_requests_jitter = 100
+
+accesslog = "-"
+errorlog = "-"
+loglevel = os.environ.get("WEB_LOG_LEVEL", "info")
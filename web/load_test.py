@@ -0,0 +1,188 @@
+"""
+Load test of the web application routes.
+
+Sends concurrent requests to the form, upload and results routes of a
+running server and reports requests per second and latency percentiles
+for each route.
+
+Usage:
+    python -m web.load_test --url http://127.0.0.1:8000 \
+        --resume data/resume.pdf --requests 200 --concurrency 16
+
+The upload route is only tested when a resume (.pdf or .docx) is given.
+Each upload has a unique file name so that the server parses it instead
+of reading its cache of parsed resumes; the parsed files are removed
+afterwards when the server shares the working directory. The results route is tested with the result of one upload, or without a
+resume with sample results saved to the local results store, which the
+server must share (same host and working directory).
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+import uuid
+
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from urllib.parse import parse_qs, urlparse
+
+from src.services.results import ResultsStore
+
+SAMPLE_RESULT_PATH = "data/sample_result.json"
+# Parsed resumes cache of the web app, see web/app.py
+RESUMES_DIR = "data/resumes"
+
+
+def sample_jobs() -> str:
+    """
+    Get the job search results stored for the results route: the sample
+    results if available, otherwise generated results.
+    Returns:
+        str: The job search results as JSON.
+    """
+    if os.path.exists(SAMPLE_RESULT_PATH):
+        with open(SAMPLE_RESULT_PATH, "r", encoding="utf-8") as f:
+            return f.read()
+
+    jobs = [
+        {
+            "id": str(i),
+            "title": f"Software Engineer {i}",
+            "company": "TechCorp",
+            "location": "New York",
+            "description": "Exciting opportunity for a software engineer. " * 5,
+            "url": f"https://example.com/job{i}",
+        }
+        for i in range(20)
+    ]
+    return json.dumps({"jobs": jobs})
+
+
+def run_route(name, send, total, concurrency) -> dict:
+    """
+    Send requests to a route and measure them.
+    Args:
+        name (str): The name of the route.
+        send (Callable): Sends one request with the given session and
+            returns the response.
+        total (int): The number of requests.
+        concurrency (int): The number of concurrent clients.
+    Returns:
+        dict: The route statistics.
+    """
+    # One keep-alive session per client thread
+    local = threading.local()
+
+    def request_once(_):
+        if not hasattr(local, "session"):
+            local.session = requests.Session()
+        start = time.perf_counter()
+        try:
+            ok = send(local.session).status_code < 400
+        except requests.RequestException:
+            ok = False
+        return time.perf_counter() - start, ok
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(request_once, range(total)))
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(latency for latency, _ in results)
+    errors = sum(1 for _, ok in results if not ok)
+
+    def percentile(p):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))]
+
+    return {
+        "route": name,
+        "requests": total,
+        "errors": errors,
+        "rps": total / elapsed,
+        "p50_ms": percentile(0.50) * 1000,
+        "p95_ms": percentile(0.95) * 1000,
+        "p99_ms": percentile(0.99) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--resume", help="resume (.pdf or .docx) to upload")
+    parser.add_argument("--keywords", default="Software Engineer, Python")
+    parser.add_argument("--location", default="US")
+    args = parser.parse_args()
+
+    url = args.url.rstrip("/")
+    headers = {"Accept-Encoding": "gzip"}
+
+    routes = {
+        "GET /": lambda http: http.get(f"{url}/", headers=headers),
+    }
+
+    if args.resume:
+        with open(args.resume, "rb") as f:
+            resume = f.read()
+        form = {"keywords": args.keywords, "location": args.location}
+        uploaded = []
+
+        def upload(http):
+            # A new file name for each upload, a known one skips parsing
+            filename = f"{uuid.uuid4().hex}-{os.path.basename(args.resume)}"
+            uploaded.append(filename)
+            # Measure the upload and search only, not the redirect
+            return http.post(
+                f"{url}/",
+                data=form,
+                files={"file": (filename, resume)},
+                headers=headers,
+                allow_redirects=False,
+            )
+
+        routes["POST /"] = upload
+
+        # The results of the upload are stored server side, get their id
+        # from the redirect to /result?id={result_id}
+        response = routes["POST /"](requests)
+        response.raise_for_status()
+        location = urlparse(response.headers.get("Location", ""))
+        result_id = parse_qs(location.query).get("id", [""])[0]
+        if not result_id:
+            parser.error("the upload did not redirect to the results page")
+    else:
+        print("No --resume given, skipping the upload route")
+        result_id = ResultsStore().save({
+            "text": "",
+            "jobs": sample_jobs(),
+            "keywords": args.keywords,
+            "location": args.location,
+        })
+
+    routes["GET /result"] = lambda http: http.get(
+        f"{url}/result", params={"id": result_id}, headers=headers)
+
+    print(f"{'route':<14}{'requests':>10}{'errors':>8}{'req/s':>10}"
+          f"{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name, send in routes.items():
+        stats = run_route(name, send, args.requests, args.concurrency)
+        print(f"{stats['route']:<14}{stats['requests']:>10}"
+              f"{stats['errors']:>8}{stats['rps']:>10.1f}"
+              f"{stats['p50_ms']:>10.1f}{stats['p95_ms']:>10.1f}"
+              f"{stats['p99_ms']:>10.1f}")
+
+    if args.resume:
+        # Remove the resumes parsed by the server, if it runs here
+        for filename in uploaded:
+            path = os.path.join(RESUMES_DIR, f"{filename}.txt")
+            if os.path.exists(path):
+                os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
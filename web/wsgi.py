@@ -0,0 +1,20 @@
+"""
+WSGI entry point of the web application for production servers.
+
+Loads the environment and imports the application, and with it the crew,
+the Jooble and Serper services and the resume parsers (PyMuPDF,
+python-docx), so that a server preloading this module pays their import
+cost once in the master process instead of on the first request of each
+worker.
+
+Usage:
+    gunicorn -c web/gunicorn.conf.py web.wsgi:app
+"""
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from web.app import app  # noqa: E402
+
+application = app